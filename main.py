@@ -1,9 +1,25 @@
+import os
 import uvicorn
-from src.infrastructure.api.api import app
+
+from src.infrastructure.settings import DATA_PATH, SHARED_DATA_PATH, SHARED_WORKER_FLAG
+
+# Número de workers do uvicorn. Com mais de um worker, os dados são carregados uma única vez
+# e publicados em um arquivo mapeado em memória compartilhado entre os processos.
+WORKERS = int(os.environ.get("API_WORKERS", "1"))
 
 if __name__ == "__main__":
     # Configuração para rodar a API
     # host="0.0.0.0" permite acesso externo (necessário para o Streamlit acessar)
     # reload=True é útil em desenvolvimento, mas omitido aqui para ambiente de produção simulado
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if WORKERS > 1:
+        from src.infrastructure.db.shared_memory_repository import SharedMemorySmartMeterRepository
+
+        # Processo carregador: lê o CSV e publica as colunas antes de iniciar os workers
+        SharedMemorySmartMeterRepository.publish_from_csv(DATA_PATH, SHARED_DATA_PATH)
+        os.environ[SHARED_WORKER_FLAG] = "1"
 
+        # Com workers, o uvicorn exige a aplicação como string de importação
+        uvicorn.run("src.infrastructure.api.api:app", host="0.0.0.0", port=8000, workers=WORKERS)
+    else:
+        from src.infrastructure.api.api import app
+        uvicorn.run(app, host="0.0.0.0", port=8000)
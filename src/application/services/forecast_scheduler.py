@@ -0,0 +1,191 @@
+import random
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Tuple
+import pandas as pd
+
+from src.domain.smart_meter.repository import ISmartMeterRepository
+from src.domain.forecasting.service import ForecastingService
+from src.application.services.forecasting_use_case import ForecastingUseCase
+
+
+@dataclass(frozen=True)
+class PrecomputedForecast:
+    """Previsão calculada em segundo plano, com metadados de atualização."""
+    start_date: datetime
+    end_date: datetime
+    forecast: pd.Series
+    generated_at: datetime
+    data_version: int
+
+    def age_seconds(self, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now()
+        return (now - self.generated_at).total_seconds()
+
+
+class IForecastStore(ABC):
+    """
+    Interface para o armazenamento da última previsão pré-calculada.
+    Define também qual processo é responsável por recalculá-la (um único refresher).
+    """
+
+    @abstractmethod
+    def acquire_refresher(self) -> bool:
+        """Retorna True se este processo é (ou acabou de se tornar) o responsável pelas atualizações."""
+        pass
+
+    @abstractmethod
+    def save(self, precomputed: PrecomputedForecast):
+        """Publica a previsão mais recente."""
+        pass
+
+    @abstractmethod
+    def load(self) -> Optional[PrecomputedForecast]:
+        """Retorna a previsão mais recente publicada, se houver."""
+        pass
+
+
+class InMemoryForecastStore(IForecastStore):
+    """Armazenamento no próprio processo (um único worker)."""
+
+    def __init__(self):
+        self._latest: Optional[PrecomputedForecast] = None
+
+    def acquire_refresher(self) -> bool:
+        return True
+
+    def save(self, precomputed: PrecomputedForecast):
+        self._latest = precomputed
+
+    def load(self) -> Optional[PrecomputedForecast]:
+        return self._latest
+
+
+class ForecastScheduler:
+    """
+    Agendador em processo que pré-calcula a previsão padrão (consumo total da frota,
+    últimos `history_days` dias, próximas `horizon` horas) após cada ingestão de dados,
+    detectada pela mudança de `repository.version`.
+    A API consulta `lookup` e só recorre ao ajuste sob demanda quando a requisição não coincide.
+    """
+
+    def __init__(
+        self,
+        repository: ISmartMeterRepository,
+        service_factory: Callable[[], ForecastingService] = ForecastingService,
+        store: Optional[IForecastStore] = None,
+        history_days: int = 30,
+        horizon: int = 72,
+        refresh_jitter_seconds: float = 30.0,
+        poll_interval_seconds: float = 5.0,
+        max_age_seconds: float = 3600.0,
+    ):
+        self.repository = repository
+        self.service_factory = service_factory
+        self.store = store or InMemoryForecastStore()
+        self.history_days = history_days
+        self.horizon = horizon
+        self.refresh_jitter_seconds = refresh_jitter_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.max_age_seconds = max_age_seconds
+
+        # (versão dos dados, janela) da última tentativa, para não repetir ajustes que falharam
+        self._last_attempt: Optional[Tuple[int, Tuple[datetime, datetime]]] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def standard_window(self, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """
+        Janela histórica padrão: termina na última hora completa e cobre `history_days` dias
+        (mesmos valores padrão usados pelo dashboard).
+        """
+        now = now or datetime.now()
+        end_date = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+        return end_date - timedelta(days=self.history_days), end_date
+
+    def refresh(self, now: Optional[datetime] = None) -> PrecomputedForecast:
+        """Ajusta o modelo para a janela padrão e publica a previsão para o horizonte máximo."""
+        # Lida antes do ajuste: dados ingeridos durante o ajuste disparam uma nova atualização
+        data_version = self.repository.version
+        start_date, end_date = self.standard_window(now)
+        self._last_attempt = (data_version, (start_date, end_date))
+
+        use_case = ForecastingUseCase(repository=self.repository, service=self.service_factory())
+        forecast_series = use_case.execute(start_date=start_date, end_date=end_date, steps=self.horizon)
+
+        precomputed = PrecomputedForecast(
+            start_date=start_date,
+            end_date=end_date,
+            forecast=forecast_series,
+            generated_at=datetime.now(),
+            data_version=data_version
+        )
+        self.store.save(precomputed)
+        return precomputed
+
+    def refresh_due(self, now: Optional[datetime] = None) -> bool:
+        """
+        Há atualização pendente quando chegaram dados novos (versão do repositório mudou).
+        Sem ingestão, a janela padrão só é recalculada depois de `max_age_seconds`.
+        """
+        window = self.standard_window(now)
+        if self._last_attempt is None:
+            return True
+        if self.repository.version != self._last_attempt[0]:
+            return True
+        latest = self.store.load()
+        aged = latest is None or latest.age_seconds(now) >= self.max_age_seconds
+        return aged and window != self._last_attempt[1]
+
+    def lookup(
+        self, start_date: datetime, end_date: datetime, steps: int, now: Optional[datetime] = None
+    ) -> Optional[Tuple[pd.Series, PrecomputedForecast]]:
+        """
+        Retorna a previsão pré-calculada (recortada em `steps` horas) se a requisição coincidir com
+        a janela da última previsão ou com a janela padrão atual, ou None para ajuste sob demanda.
+        Enquanto a atualização da nova janela está pendente, a última previsão continua sendo servida
+        (a partir da hora seguinte a `end_date`); sua idade indica o quanto está defasada.
+        """
+        if steps < 1 or steps > self.horizon:
+            return None
+        latest = self.store.load()
+        if latest is None:
+            return None
+        window = (start_date, end_date)
+        if window != (latest.start_date, latest.end_date) and window != self.standard_window(now):
+            return None
+
+        forecast = latest.forecast[latest.forecast.index > end_date]
+        if len(forecast) < steps:
+            return None
+        return forecast.iloc[:steps], latest
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval_seconds):
+            # Apenas o refresher ajusta o modelo; os demais workers leem a previsão publicada
+            if not self.store.acquire_refresher() or not self.refresh_due():
+                continue
+            # Jitter: agrupa ingestões em rajada e espalha as tentativas entre os workers
+            if self._stop_event.wait(random.uniform(0, self.refresh_jitter_seconds)):
+                break
+            try:
+                precomputed = self.refresh()
+                print(f"Previsão padrão atualizada: {precomputed.start_date} - {precomputed.end_date}")
+            except Exception as e:
+                print(f"Erro ao atualizar previsão padrão: {e}")
+
+    def start(self):
+        """Inicia a thread de atualização em segundo plano."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="forecast-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Sinaliza a parada da thread de atualização."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
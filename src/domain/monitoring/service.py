@@ -0,0 +1,193 @@
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+HOURS_PER_WEEK = 24 * 7
+
+
+@dataclass(frozen=True)
+class AnomalyEvent:
+    """Leitura que se desviou do comportamento esperado do medidor."""
+    meter_id: str
+    timestamp: datetime
+    consumption_kwh: float
+    expected_kwh: float
+    z_score: float
+
+
+@dataclass(frozen=True)
+class MeterPeak:
+    """Pico atual da janela deslizante de um medidor."""
+    meter_id: str
+    peak_kwh: float
+    peak_timestamp: datetime
+    window_mean_kwh: float
+    window_std_kwh: float
+    last_timestamp: datetime
+    last_consumption_kwh: float
+
+
+class _MeterStream:
+    """
+    Estado incremental de um medidor. Cada atualização é O(1) (amortizado):
+    - média/variância da janela deslizante via Welford (com remoção do valor que sai);
+    - máximo da janela via deque monotônica;
+    - perfil sazonal por hora da semana: média/variância exponenciais da razão entre a leitura
+      e a média da janela, de modo que a linha de base acompanhe a tendência do nível de consumo;
+    - média exponencial do z-score, para desvios sustentados (ex: onda de calor).
+    """
+
+    def __init__(self, window_size: int, seasonal_alpha: float):
+        self.window_size = window_size
+        self.seasonal_alpha = seasonal_alpha
+
+        self._window: Deque[Tuple[int, datetime, float]] = deque()
+        self._max_deque: Deque[Tuple[int, datetime, float]] = deque()
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._position = 0
+        self.smoothed_z = 0.0
+
+        # (média, variância, amostras) da razão leitura/média da janela para cada uma das 168 horas da semana
+        self._seasonal: List[List[float]] = [[0.0, 0.0, 0] for _ in range(HOURS_PER_WEEK)]
+
+    @property
+    def window_std(self) -> float:
+        return math.sqrt(self._m2 / (self._count - 1)) if self._count > 1 else 0.0
+
+    def expected(self, timestamp: datetime, min_seasonal_samples: int) -> Tuple[float, float]:
+        """Retorna (valor esperado, desvio padrão) para o instante, priorizando a linha de base sazonal."""
+        ratio, variance, samples = self._seasonal[timestamp.weekday() * 24 + timestamp.hour]
+        if samples >= min_seasonal_samples and self._mean > 0:
+            return self._mean * ratio, self._mean * math.sqrt(variance)
+        return self._mean, self.window_std
+
+    def update(self, timestamp: datetime, value: float):
+        # Perfil sazonal, relativo à média da janela antes de incluir a leitura.
+        # Só com a janela cheia: razões sobre uma janela parcial distorceriam a variância por semanas.
+        if self._count == self.window_size and self._mean > 0:
+            ratio = value / self._mean
+            bucket = self._seasonal[timestamp.weekday() * 24 + timestamp.hour]
+            if bucket[2] == 0:
+                bucket[0], bucket[1] = ratio, 0.0
+            else:
+                diff = ratio - bucket[0]
+                increment = self.seasonal_alpha * diff
+                bucket[0] += increment
+                bucket[1] = (1 - self.seasonal_alpha) * (bucket[1] + diff * increment)
+            bucket[2] += 1
+
+        # Janela deslizante: Welford com remoção do valor mais antigo
+        if self._count == self.window_size:
+            _, _, old = self._window.popleft()
+            self._count -= 1
+            if self._count == 0:
+                self._mean, self._m2 = 0.0, 0.0
+            else:
+                old_mean = self._mean
+                self._mean -= (old - self._mean) / self._count
+                self._m2 = max(self._m2 - (old - old_mean) * (old - self._mean), 0.0)
+
+        self._window.append((self._position, timestamp, value))
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+        # Máximo da janela: remove do fim os valores menores (nunca serão o máximo) e do início os expirados
+        while self._max_deque and self._max_deque[-1][2] <= value:
+            self._max_deque.pop()
+        self._max_deque.append((self._position, timestamp, value))
+        while self._max_deque[0][0] <= self._position - self.window_size:
+            self._max_deque.popleft()
+        self._position += 1
+
+    def peak(self, meter_id: str) -> MeterPeak:
+        _, peak_timestamp, peak_value = self._max_deque[0]
+        _, last_timestamp, last_value = self._window[-1]
+        return MeterPeak(
+            meter_id=meter_id,
+            peak_kwh=peak_value,
+            peak_timestamp=peak_timestamp,
+            window_mean_kwh=self._mean,
+            window_std_kwh=self.window_std,
+            last_timestamp=last_timestamp,
+            last_consumption_kwh=last_value
+        )
+
+
+class StreamingPeakDetector:
+    """
+    Serviço de Domínio que acompanha as leituras à medida que são ingeridas e sinaliza
+    sobrecargas. O custo é proporcional à taxa de ingestão, não ao tamanho do histórico.
+    """
+
+    def __init__(
+        self,
+        window_size: int = HOURS_PER_WEEK,
+        seasonal_alpha: float = 0.1,
+        z_threshold: float = 4.0,
+        sustained_alpha: float = 0.2,
+        sustained_threshold: float = 2.0,
+        sustained_min_z: float = 1.0,
+        min_seasonal_samples: int = 12,
+        max_anomalies: int = 1000,
+    ):
+        if window_size < 1:
+            raise ValueError("Window size must be positive.")
+        self.window_size = window_size
+        self.seasonal_alpha = seasonal_alpha
+        self.z_threshold = z_threshold
+        self.sustained_alpha = sustained_alpha
+        self.sustained_threshold = sustained_threshold
+        self.sustained_min_z = sustained_min_z
+        self.min_seasonal_samples = min_seasonal_samples
+        self.max_anomalies = max_anomalies
+
+        self._streams: Dict[str, _MeterStream] = {}
+        self._anomalies: Deque[AnomalyEvent] = deque(maxlen=max_anomalies)
+        self._lock = threading.Lock()
+
+    def update(self, meter_id: str, timestamp: datetime, consumption_kwh: float) -> Optional[AnomalyEvent]:
+        """Processa uma leitura e retorna o evento de anomalia, se houver."""
+        with self._lock:
+            stream = self._streams.get(meter_id)
+            if stream is None:
+                stream = self._streams[meter_id] = _MeterStream(self.window_size, self.seasonal_alpha)
+
+            # A leitura é comparada com o esperado antes de entrar nas estatísticas.
+            # Sinaliza picos isolados (z-score) e desvios sustentados (z-score suavizado), desde que
+            # a própria leitura esteja claramente acima do esperado: o fim de uma sobrecarga não é uma anomalia.
+            event = None
+            expected, std = stream.expected(timestamp, self.min_seasonal_samples)
+            if std > 0:
+                z_score = (consumption_kwh - expected) / std
+                stream.smoothed_z += self.sustained_alpha * (z_score - stream.smoothed_z)
+                sustained = z_score >= self.sustained_min_z and stream.smoothed_z >= self.sustained_threshold
+                if z_score >= self.z_threshold or sustained:
+                    event = AnomalyEvent(
+                        meter_id=meter_id,
+                        timestamp=timestamp,
+                        consumption_kwh=consumption_kwh,
+                        expected_kwh=expected,
+                        z_score=z_score
+                    )
+                    self._anomalies.append(event)
+
+            stream.update(timestamp, consumption_kwh)
+            return event
+
+    def get_peaks(self) -> List[MeterPeak]:
+        """Retorna o pico atual da janela deslizante de cada medidor."""
+        with self._lock:
+            return [stream.peak(meter_id) for meter_id, stream in sorted(self._streams.items())]
+
+    def get_anomalies(self, meter_id: Optional[str] = None, limit: int = 100) -> List[AnomalyEvent]:
+        """Retorna as anomalias mais recentes (da mais nova para a mais antiga)."""
+        with self._lock:
+            events = [e for e in reversed(self._anomalies) if meter_id is None or e.meter_id == meter_id]
+        return events[:max(limit, 0)]
@@ -24,6 +24,14 @@ class ISmartMeterRepository(ABC):
         """Salva um novo registro de consumo."""
         pass
 
+    @property
+    def version(self) -> int:
+        """
+        Contador de alterações (incrementado a cada registro salvo), usado para detectar ingestões.
+        Implementações sem rastreamento de alterações retornam sempre 0.
+        """
+        return 0
+
     @abstractmethod
     def get_total_consumption_by_hour(self, start_date: datetime, end_date: datetime) -> dict:
         """Retorna o consumo total agregado por hora para o período."""
@@ -1,24 +1,41 @@
-from fastapi import FastAPI, Depends, HTTPException
+import os
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 
-from src.infrastructure.api.schemas import ForecastRequestSchema, ForecastResponseSchema, HealthCheckResponse, ErrorResponse
+from src.infrastructure.api.schemas import (
+    ForecastRequestSchema, ForecastResponseSchema, HealthCheckResponse, ErrorResponse,
+    MeterPeakSchema, AnomalySchema, PeakMonitoringResponseSchema
+)
 from src.application.services.forecasting_use_case import ForecastingUseCase
+from src.application.services.forecast_scheduler import ForecastScheduler, InMemoryForecastStore
 from src.domain.smart_meter.repository import ISmartMeterRepository
 from src.domain.forecasting.service import ForecastingService
+from src.domain.monitoring.service import StreamingPeakDetector
 from src.infrastructure.db.in_memory_repository import InMemorySmartMeterRepository
+from src.infrastructure.db.shared_memory_repository import SharedMemorySmartMeterRepository
+from src.infrastructure.db.shared_forecast_store import SharedForecastStore
+from src.infrastructure.settings import DATA_PATH, SHARED_DATA_PATH, USE_SHARED_DATA
 
 # --- Dependências (Factory Pattern) ---
 
-# Inicializa o repositório em memória com os dados do CSV
-REPO_PATH = "/home/ubuntu/smart_meter_guide/data/smart_meter_data.csv"
-in_memory_repo = InMemorySmartMeterRepository(initial_data_path=REPO_PATH)
+# Detector de picos/anomalias alimentado pelo repositório a cada leitura ingerida
+MAX_ANOMALIES = 1000
+peak_detector = StreamingPeakDetector(max_anomalies=MAX_ANOMALIES)
+
+# Inicializa o repositório com os dados do CSV (DATA_PATH: SMART_METER_DATA_PATH ou REPO_PATH).
+# Em modo multi-worker (ver main.py), o processo carregador já publicou os dados em SHARED_DATA_PATH
+# e cada worker apenas se anexa ao arquivo, em vez de reler o CSV.
+if USE_SHARED_DATA:
+    repository = SharedMemorySmartMeterRepository(shared_path=SHARED_DATA_PATH, detector=peak_detector)
+else:
+    repository = InMemorySmartMeterRepository(initial_data_path=DATA_PATH, detector=peak_detector)
 
 def get_smart_meter_repository() -> ISmartMeterRepository:
     """Dependência para obter a instância do repositório."""
     # Aqui, a Injeção de Dependência permite trocar facilmente para PostgresSmartMeterRepository
     # sem alterar o código da aplicação/domínio (Princípio Aberto/Fechado)
-    return in_memory_repo
+    return repository
 
 def get_forecasting_use_case(
     repository: ISmartMeterRepository = Depends(get_smart_meter_repository)
@@ -29,6 +46,26 @@ def get_forecasting_use_case(
     # Injeta as dependências no Caso de Uso
     return ForecastingUseCase(repository=repository, service=forecasting_service)
 
+def get_peak_detector() -> StreamingPeakDetector:
+    """Dependência para obter o detector de picos, sincronizado com as leituras já publicadas."""
+    if USE_SHARED_DATA:
+        # Em modo multi-worker, consome os registros gravados por outros workers
+        repository.refresh_detector()
+    return peak_detector
+
+# Agendador das previsões padrão (frota total, últimos 30 dias, até 72 horas), atualizado após cada ingestão.
+# Em modo multi-worker, apenas um worker recalcula e publica a previsão ao lado dos dados compartilhados.
+forecast_scheduler = ForecastScheduler(
+    repository=repository,
+    service_factory=lambda: ForecastingService(model_order=(5, 1, 0)),
+    store=SharedForecastStore(f"{SHARED_DATA_PATH}.forecast.json") if USE_SHARED_DATA else InMemoryForecastStore(),
+    refresh_jitter_seconds=float(os.environ.get("FORECAST_REFRESH_JITTER_SECONDS", "30"))
+)
+
+def get_forecast_scheduler() -> ForecastScheduler:
+    """Dependência para obter o agendador de previsões pré-calculadas."""
+    return forecast_scheduler
+
 # --- Configuração da API ---
 
 app = FastAPI(
@@ -37,6 +74,14 @@ app = FastAPI(
     version="1.0.0"
 )
 
+@app.on_event("startup")
+def start_forecast_scheduler():
+    forecast_scheduler.start()
+
+@app.on_event("shutdown")
+def stop_forecast_scheduler():
+    forecast_scheduler.stop()
+
 # --- Endpoints ---
 
 @app.get("/health", response_model=HealthCheckResponse, tags=["Monitoramento"])
@@ -44,6 +89,23 @@ def health_check():
     """Verifica a saúde da API."""
     return HealthCheckResponse()
 
+@app.get("/monitoring/peaks", response_model=PeakMonitoringResponseSchema, tags=["Monitoramento"])
+def monitoring_peaks(
+    meter_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_ANOMALIES),
+    detector: StreamingPeakDetector = Depends(get_peak_detector)
+):
+    """
+    Retorna o pico atual da janela deslizante de cada medidor e as anomalias mais recentes
+    detectadas durante a ingestão (sem executar uma previsão).
+    """
+    peaks = [p for p in detector.get_peaks() if meter_id is None or p.meter_id == meter_id]
+    anomalies = detector.get_anomalies(meter_id=meter_id, limit=limit)
+    return PeakMonitoringResponseSchema(
+        peaks=[MeterPeakSchema(**vars(p)) for p in peaks],
+        anomalies=[AnomalySchema(**vars(a)) for a in anomalies]
+    )
+
 @app.post(
     "/forecast/demand", 
     response_model=List[ForecastResponseSchema], 
@@ -51,12 +113,17 @@ def health_check():
     tags=["Previsão"],
     responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}}
 )
-async def forecast_demand(
+def forecast_demand(
     request: ForecastRequestSchema,
-    use_case: ForecastingUseCase = Depends(get_forecasting_use_case)
+    response: Response,
+    use_case: ForecastingUseCase = Depends(get_forecasting_use_case),
+    scheduler: ForecastScheduler = Depends(get_forecast_scheduler)
 ):
     """
     Realiza a previsão de demanda total de energia para as próximas 'steps' horas.
+    Requisições na janela padrão são servidas a partir das previsões pré-calculadas;
+    os cabeçalhos X-Forecast-* informam a origem e a idade da previsão.
+    Síncrono de propósito: o ajuste sob demanda roda no threadpool, sem bloquear o event loop.
     """
     try:
         # Validação de datas (exemplo de regra de negócio na camada de Aplicação)
@@ -66,12 +133,21 @@ async def forecast_demand(
                 detail="A data de início deve ser anterior à data de fim."
             )
 
-        # Executa o Caso de Uso
-        forecast_series = use_case.execute(
-            start_date=request.start_date,
-            end_date=request.end_date,
-            steps=request.steps
-        )
+        precomputed = scheduler.lookup(request.start_date, request.end_date, request.steps)
+        if precomputed is not None:
+            forecast_series, metadata = precomputed
+            response.headers["X-Forecast-Source"] = "precomputed"
+            response.headers["X-Forecast-Generated-At"] = metadata.generated_at.isoformat()
+            response.headers["X-Forecast-Age-Seconds"] = f"{metadata.age_seconds():.0f}"
+            response.headers["X-Forecast-Window-End"] = metadata.end_date.isoformat()
+        else:
+            # Executa o Caso de Uso (ajuste sob demanda)
+            forecast_series = use_case.execute(
+                start_date=request.start_date,
+                end_date=request.end_date,
+                steps=request.steps
+            )
+            response.headers["X-Forecast-Source"] = "on-demand"
 
         # Converte o resultado (pd.Series) para o Schema de Resposta
         response_data = []
@@ -20,6 +20,29 @@ class ForecastResponseSchema(BaseModel):
     timestamp: datetime
     predicted_consumption_kwh: float
 
+class MeterPeakSchema(BaseModel):
+    """Schema para o pico atual da janela deslizante de um medidor."""
+    meter_id: str
+    peak_kwh: float
+    peak_timestamp: datetime
+    window_mean_kwh: float
+    window_std_kwh: float
+    last_timestamp: datetime
+    last_consumption_kwh: float
+
+class AnomalySchema(BaseModel):
+    """Schema para uma leitura anômala detectada na ingestão."""
+    meter_id: str
+    timestamp: datetime
+    consumption_kwh: float
+    expected_kwh: float
+    z_score: float
+
+class PeakMonitoringResponseSchema(BaseModel):
+    """Schema para a resposta do monitoramento de picos e anomalias."""
+    peaks: List[MeterPeakSchema]
+    anomalies: List[AnomalySchema]
+
 class HealthCheckResponse(BaseModel):
     """Schema para o Health Check da API."""
     status: str = "ok"
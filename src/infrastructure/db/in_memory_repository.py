@@ -4,6 +4,7 @@ import pandas as pd
 
 from src.domain.smart_meter.repository import ISmartMeterRepository
 from src.domain.smart_meter.entities import ConsumptionRecord
+from src.domain.monitoring.service import StreamingPeakDetector
 
 # Repositório de Infraestrutura (Implementação Concreta)
 class InMemorySmartMeterRepository(ISmartMeterRepository):
@@ -13,9 +14,11 @@ class InMemorySmartMeterRepository(ISmartMeterRepository):
     (Princípio Aberto/Fechado: Aberto para extensão (nova implementação DB), Fechado para modificação (a interface não muda))
     """
     
-    def __init__(self, initial_data_path: str = None):
+    def __init__(self, initial_data_path: str = None, detector: Optional[StreamingPeakDetector] = None):
         self._data: List[ConsumptionRecord] = []
         self._meters: Dict[str, bool] = {} # Simplesmente para rastrear IDs de medidores
+        self._detector = detector # Detector de picos alimentado a cada leitura ingerida
+        self._version = 0 # Incrementado a cada registro salvo (ver ISmartMeterRepository.version)
         
         if initial_data_path:
             self._load_initial_data(initial_data_path)
@@ -35,10 +38,16 @@ class InMemorySmartMeterRepository(ISmartMeterRepository):
                 )
                 self._data.append(record)
                 self._meters[row['meter_id']] = True
+                if self._detector:
+                    self._detector.update(row['meter_id'], record.timestamp, record.consumption_kwh)
             print(f"Dados iniciais carregados: {len(self._data)} registros.")
         except Exception as e:
             print(f"Erro ao carregar dados iniciais: {e}")
 
+    @property
+    def version(self) -> int:
+        return self._version
+
     def get_all_meters(self) -> List[str]:
         """Retorna todos os IDs de medidores."""
         return list(self._meters.keys())
@@ -57,6 +66,9 @@ class InMemorySmartMeterRepository(ISmartMeterRepository):
         """Salva um novo registro de consumo."""
         self._data.append(record)
         self._meters[meter_id] = True
+        self._version += 1
+        if self._detector:
+            self._detector.update(meter_id, record.timestamp, record.consumption_kwh)
 
     def get_total_consumption_by_hour(self, start_date: datetime, end_date: datetime) -> List[Dict]:
         """Retorna o consumo total agregado por hora para o período."""
@@ -0,0 +1,75 @@
+import fcntl
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from src.application.services.forecast_scheduler import IForecastStore, PrecomputedForecast
+
+
+class SharedForecastStore(IForecastStore):
+    """
+    Armazenamento da previsão pré-calculada em um arquivo JSON ao lado dos dados compartilhados,
+    para o modo multi-worker. Um único worker (o que obtém o flock não bloqueante em `lock_path`)
+    recalcula a previsão; os demais apenas leem o arquivo publicado.
+    O lock é separado do arquivo de dados para não bloquear as escritas do repositório.
+    """
+
+    def __init__(self, path: str, lock_path: Optional[str] = None):
+        self._path = path
+        self._lock_path = lock_path or f"{path}.lock"
+        self._lock_file = None
+
+        # Cache da última leitura, invalidado pela data de modificação do arquivo
+        self._cached: Optional[PrecomputedForecast] = None
+        self._cached_mtime: Optional[int] = None
+
+    def acquire_refresher(self) -> bool:
+        """Tenta (sem bloquear) assumir o papel de refresher; o lock dura enquanto o processo viver."""
+        if self._lock_file is not None:
+            return True
+        lock_file = open(self._lock_path, "a+b")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def save(self, precomputed: PrecomputedForecast):
+        payload = {
+            "start_date": precomputed.start_date.isoformat(),
+            "end_date": precomputed.end_date.isoformat(),
+            "generated_at": precomputed.generated_at.isoformat(),
+            "data_version": precomputed.data_version,
+            "timestamps": [ts.isoformat() for ts in precomputed.forecast.index],
+            "values": [float(v) for v in precomputed.forecast.values],
+        }
+        # Troca atômica: leitores nunca enxergam um arquivo parcialmente escrito
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self._path)
+
+    def load(self) -> Optional[PrecomputedForecast]:
+        try:
+            mtime = os.stat(self._path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime == self._cached_mtime:
+            return self._cached
+
+        with open(self._path) as f:
+            payload = json.load(f)
+        self._cached = PrecomputedForecast(
+            start_date=datetime.fromisoformat(payload["start_date"]),
+            end_date=datetime.fromisoformat(payload["end_date"]),
+            forecast=pd.Series(payload["values"], index=pd.to_datetime(payload["timestamps"])),
+            generated_at=datetime.fromisoformat(payload["generated_at"]),
+            data_version=payload["data_version"]
+        )
+        self._cached_mtime = mtime
+        return self._cached
@@ -0,0 +1,275 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional, Dict
+
+import numpy as np
+import pandas as pd
+
+from src.domain.smart_meter.repository import ISmartMeterRepository
+from src.domain.smart_meter.entities import ConsumptionRecord
+from src.domain.monitoring.service import StreamingPeakDetector
+
+# Layout do arquivo compartilhado:
+# [cabeçalho fixo][tabela de medidores][colunas: timestamp | meter | consumo | temperatura | fim de semana]
+# A tabela de medidores é append-only: IDs em UTF-8 terminados por "\n". Qualquer prefixo até o
+# tamanho publicado (`meters_bytes`) é uma tabela válida, então leitores não precisam de lock.
+_MAGIC = b"SMTRSHM1"
+_HEADER = struct.Struct("<8sQQQQ")  # magic, version, length, capacity, meters_bytes
+_HEADER_SIZE = 64
+_METERS_REGION_SIZE = 64 * 1024
+_COLUMNS = (
+    ("timestamp", np.int64),
+    ("meter", np.int32),
+    ("consumption_kwh", np.float64),
+    ("temperature_c", np.float64),
+    ("is_weekend", np.bool_),
+)
+
+# Posições dos campos no cabeçalho (atualizados in-place pelos writers)
+_VERSION_OFFSET = 8
+_LENGTH_OFFSET = 16
+_METERS_BYTES_OFFSET = 32
+
+
+def _columns_size(capacity: int) -> int:
+    return sum(np.dtype(dtype).itemsize * capacity for _, dtype in _COLUMNS)
+
+
+def _encode_meters(meter_ids: List[str]) -> bytes:
+    for meter_id in meter_ids:
+        if "\n" in meter_id:
+            raise ValueError(f"ID de medidor inválido: {meter_id!r}")
+    return "".join(f"{meter_id}\n" for meter_id in meter_ids).encode("utf-8")
+
+
+class SharedMemorySmartMeterRepository(ISmartMeterRepository):
+    """
+    Repositório que lê os dados de consumo de um arquivo mapeado em memória (mmap) compartilhado.
+    Um único processo carregador publica as colunas com `publish_from_csv`; cada worker do uvicorn
+    apenas se anexa ao arquivo, sem copiar os dados (as páginas são compartilhadas pelo sistema operacional).
+    O contador `version` é incrementado a cada escrita, permitindo que os workers detectem dados novos.
+
+    Protocolo de escrita (sob flock exclusivo): tabela de medidores -> colunas -> `length` -> `version`.
+    Um leitor que lê `length` e depois a tabela de medidores sempre encontra todos os medidores
+    referenciados pelas linhas visíveis; e quem observa uma nova `version` já enxerga a linha nova.
+    """
+
+    def __init__(self, shared_path: str, detector: Optional[StreamingPeakDetector] = None):
+        self._path = shared_path
+        self._file = open(shared_path, "r+b")
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+        magic, _, _, capacity, _ = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Arquivo compartilhado inválido: {shared_path}")
+        self._capacity = capacity
+
+        # Visões numpy diretamente sobre o mmap (zero-copy)
+        self._columns: Dict[str, np.ndarray] = {}
+        offset = _HEADER_SIZE + _METERS_REGION_SIZE
+        for name, dtype in _COLUMNS:
+            self._columns[name] = np.frombuffer(self._mmap, dtype=dtype, count=capacity, offset=offset)
+            offset += np.dtype(dtype).itemsize * capacity
+
+        self._meters_cache: List[str] = []
+        self._meters_bytes = 0
+
+        # Cada worker mantém seu próprio detector; `_detector_position` marca até onde ele já consumiu
+        self._detector = detector
+        self._detector_position = 0
+        self._detector_lock = threading.Lock()
+        self.refresh_detector()
+
+    # --- Publicação (processo carregador) ---
+
+    @classmethod
+    def publish_from_csv(cls, csv_path: str, shared_path: str, headroom: int = 100_000) -> str:
+        """
+        Carrega o CSV uma única vez e publica as colunas no arquivo compartilhado.
+        `headroom` reserva espaço para registros gravados depois da carga inicial.
+        Retorna o caminho publicado; o carregador não mantém o arquivo mapeado.
+        """
+        df = pd.read_csv(csv_path)
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        meter_codes, meter_ids = pd.factorize(df['meter_id'])
+
+        length = len(df)
+        capacity = length + headroom
+        meters_blob = _encode_meters(list(meter_ids))
+        if len(meters_blob) > _METERS_REGION_SIZE:
+            raise ValueError("Quantidade de medidores excede a região reservada no arquivo compartilhado.")
+
+        tmp_path = f"{shared_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.truncate(_HEADER_SIZE + _METERS_REGION_SIZE + _columns_size(capacity))
+        with open(tmp_path, "r+b") as f:
+            mm = mmap.mmap(f.fileno(), 0)
+            _HEADER.pack_into(mm, 0, _MAGIC, 1, length, capacity, len(meters_blob))
+            mm[_HEADER_SIZE:_HEADER_SIZE + len(meters_blob)] = meters_blob
+
+            values = {
+                "timestamp": df['timestamp'].values.astype("datetime64[ns]").astype(np.int64),
+                "meter": meter_codes.astype(np.int32),
+                "consumption_kwh": df['consumption_kwh'].to_numpy(dtype=np.float64),
+                "temperature_c": df['temperature_c'].to_numpy(dtype=np.float64),
+                "is_weekend": df['is_weekend'].to_numpy(dtype=np.bool_),
+            }
+            offset = _HEADER_SIZE + _METERS_REGION_SIZE
+            for name, dtype in _COLUMNS:
+                column = np.frombuffer(mm, dtype=dtype, count=capacity, offset=offset)
+                column[:length] = values[name]
+                offset += np.dtype(dtype).itemsize * capacity
+                del column
+            mm.flush()
+            mm.close()
+
+        # Troca atômica: workers nunca enxergam um arquivo parcialmente escrito
+        os.replace(tmp_path, shared_path)
+        print(f"Dados publicados em memória compartilhada: {length} registros ({shared_path}).")
+        return shared_path
+
+    # --- Estado compartilhado ---
+
+    @property
+    def version(self) -> int:
+        """Contador incrementado a cada alteração publicada no arquivo compartilhado."""
+        return struct.unpack_from("<Q", self._mmap, _VERSION_OFFSET)[0]
+
+    def _length(self) -> int:
+        return struct.unpack_from("<Q", self._mmap, _LENGTH_OFFSET)[0]
+
+    @contextmanager
+    def _write_lock(self):
+        """Lock entre processos (flock) para serializar as escritas dos workers."""
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _read_meters(self) -> List[str]:
+        # A tabela só cresce: basta decodificar os bytes acrescentados desde a última leitura.
+        # Chamar depois de `_length()`: a tabela é gravada antes de `length` ser publicado.
+        size = struct.unpack_from("<Q", self._mmap, _METERS_BYTES_OFFSET)[0]
+        if size > self._meters_bytes:
+            blob = bytes(self._mmap[_HEADER_SIZE + self._meters_bytes:_HEADER_SIZE + size])
+            self._meters_cache = self._meters_cache + blob.decode("utf-8").split("\n")[:-1]
+            self._meters_bytes = size
+        return self._meters_cache
+
+    def _append_meter(self, meter_id: str) -> int:
+        """Grava o medidor após a tabela atual (ainda invisível) e retorna o novo tamanho. Requer o write lock."""
+        size = struct.unpack_from("<Q", self._mmap, _METERS_BYTES_OFFSET)[0]
+        entry = _encode_meters([meter_id])
+        if size + len(entry) > _METERS_REGION_SIZE:
+            raise RuntimeError("Quantidade de medidores excede a região reservada no arquivo compartilhado.")
+        self._mmap[_HEADER_SIZE + size:_HEADER_SIZE + size + len(entry)] = entry
+        return size + len(entry)
+
+    def _publish_meters(self, size: int):
+        """Torna visíveis os medidores gravados até `size`. Requer o write lock."""
+        struct.pack_into("<Q", self._mmap, _METERS_BYTES_OFFSET, size)
+
+    def _select(self, start_date: datetime, end_date: datetime) -> np.ndarray:
+        """Retorna a máscara booleana dos registros publicados dentro do período."""
+        length = self._length()
+        timestamps = self._columns["timestamp"][:length]
+        start = pd.Timestamp(start_date).value
+        end = pd.Timestamp(end_date).value
+        return (timestamps >= start) & (timestamps <= end)
+
+    def refresh_detector(self):
+        """
+        Alimenta o detector com os registros publicados desde a última chamada
+        (inclusive os gravados por outros workers). O custo depende apenas dos registros novos.
+        """
+        if not self._detector:
+            return
+        with self._detector_lock:
+            length = self._length()
+            if length <= self._detector_position:
+                return
+
+            start = self._detector_position
+            meters = self._read_meters()
+            timestamps = pd.to_datetime(self._columns["timestamp"][start:length])
+            meter_codes = self._columns["meter"][start:length]
+            consumption = self._columns["consumption_kwh"][start:length]
+            for ts, code, value in zip(timestamps, meter_codes, consumption):
+                self._detector.update(meters[code], ts, float(value))
+            self._detector_position = length
+
+    # --- ISmartMeterRepository ---
+
+    def get_all_meters(self) -> List[str]:
+        """Retorna todos os IDs de medidores."""
+        return list(self._read_meters())
+
+    def get_consumption_data(self, start_date: datetime, end_date: datetime, meter_id: Optional[str] = None) -> List[ConsumptionRecord]:
+        """Retorna dados de consumo para um período e opcionalmente para um medidor específico."""
+        mask = self._select(start_date, end_date)
+        length = len(mask)
+        if meter_id is not None:
+            meters = self._read_meters()  # lida depois de `length` (em _select)
+            if meter_id not in meters:
+                return []
+            mask &= self._columns["meter"][:length] == meters.index(meter_id)
+
+        indexes = np.flatnonzero(mask)
+        timestamps = pd.to_datetime(self._columns["timestamp"][indexes])
+        return [
+            ConsumptionRecord(
+                timestamp=ts,
+                consumption_kwh=float(self._columns["consumption_kwh"][i]),
+                temperature_c=float(self._columns["temperature_c"][i]),
+                is_weekend=bool(self._columns["is_weekend"][i])
+            )
+            for ts, i in zip(timestamps, indexes)
+        ]
+
+    def save_consumption_record(self, record: ConsumptionRecord, meter_id: str):
+        """Salva um novo registro de consumo, visível para todos os workers."""
+        with self._write_lock():
+            length = self._length()
+            if length >= self._capacity:
+                raise RuntimeError("Capacidade do arquivo compartilhado esgotada; republique os dados com mais headroom.")
+
+            meters = self._read_meters()
+            if meter_id not in meters:
+                self._publish_meters(self._append_meter(meter_id))
+                meters = self._read_meters()
+
+            self._columns["timestamp"][length] = pd.Timestamp(record.timestamp).value
+            self._columns["meter"][length] = meters.index(meter_id)
+            self._columns["consumption_kwh"][length] = record.consumption_kwh
+            self._columns["temperature_c"][length] = record.temperature_c
+            self._columns["is_weekend"][length] = record.is_weekend
+
+            # Publica a linha (`length`) e só então sinaliza a nova versão
+            struct.pack_into("<Q", self._mmap, _LENGTH_OFFSET, length + 1)
+            struct.pack_into("<Q", self._mmap, _VERSION_OFFSET, self.version + 1)
+
+        self.refresh_detector()
+
+    def get_total_consumption_by_hour(self, start_date: datetime, end_date: datetime) -> List[Dict]:
+        """Retorna o consumo total agregado por hora para o período (agregação vetorizada)."""
+        mask = self._select(start_date, end_date)
+        length = len(mask)
+        timestamps = self._columns["timestamp"][:length][mask]
+        consumption = self._columns["consumption_kwh"][:length][mask]
+        if timestamps.size == 0:
+            return []
+
+        hour_ns = 3_600_000_000_000
+        hours, inverse = np.unique(timestamps // hour_ns * hour_ns, return_inverse=True)
+        totals = np.bincount(inverse, weights=consumption)
+
+        return [
+            {'timestamp': ts, 'consumption': round(float(total), 2)}
+            for ts, total in zip(pd.to_datetime(hours), totals)
+        ]
@@ -0,0 +1,18 @@
+import os
+
+# Configuração compartilhada entre main.py (processo carregador) e a API (workers).
+# Mantida sem efeitos colaterais para que main.py possa importá-la sem carregar os dados.
+
+# Caminho padrão do CSV com os dados iniciais
+REPO_PATH = "/home/ubuntu/smart_meter_guide/data/smart_meter_data.csv"
+
+# CSV efetivamente carregado, tanto com um worker quanto no modo multi-worker
+DATA_PATH = os.environ.get("SMART_METER_DATA_PATH", REPO_PATH)
+
+# Arquivo mapeado em memória onde o carregador publica os dados no modo multi-worker
+SHARED_DATA_PATH = os.environ.get("SMART_METER_SHARED_DATA_PATH", "/dev/shm/smart_meter_data.bin")
+
+# Flag definida apenas por main.py, no modo multi-worker, depois de publicar SHARED_DATA_PATH.
+# Separada do caminho para que um arquivo antigo em SHARED_DATA_PATH nunca seja anexado por engano.
+SHARED_WORKER_FLAG = "SMART_METER_SHARED_WORKER"
+USE_SHARED_DATA = os.environ.get(SHARED_WORKER_FLAG) == "1"
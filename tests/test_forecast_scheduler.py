@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src.application.services.forecast_scheduler import ForecastScheduler, PrecomputedForecast
+from src.infrastructure.db.shared_forecast_store import SharedForecastStore
+
+NOW = datetime(2024, 7, 1, 10, 20)
+
+
+class FakeRepository:
+    def __init__(self):
+        self.version = 0
+
+    def get_total_consumption_by_hour(self, start_date, end_date):
+        return [{'timestamp': end_date - timedelta(hours=i), 'consumption': 10.0} for i in range(3, -1, -1)]
+
+
+class FakeService:
+    def train_model(self, historical_data):
+        self._last = historical_data.index[-1]
+
+    def predict_demand(self, steps):
+        index = pd.date_range(start=self._last + timedelta(hours=1), periods=steps, freq="h")
+        return pd.Series(range(steps), index=index, dtype=float)
+
+
+@pytest.fixture
+def scheduler():
+    return ForecastScheduler(repository=FakeRepository(), service_factory=FakeService, history_days=30, horizon=72)
+
+
+def test_standard_window_matches_dashboard_default(scheduler):
+    assert scheduler.standard_window(NOW) == (datetime(2024, 6, 1, 9), datetime(2024, 7, 1, 9))
+
+
+def test_lookup_serves_refreshed_window(scheduler):
+    start, end = scheduler.standard_window(NOW)
+    assert scheduler.lookup(start, end, 24, now=NOW) is None
+
+    scheduler.refresh(now=NOW)
+    forecast, metadata = scheduler.lookup(start, end, 24, now=NOW)
+    assert len(forecast) == 24
+    assert forecast.index[0] == end + timedelta(hours=1)
+    assert metadata.data_version == 0
+
+    assert len(scheduler.lookup(start, end, 72, now=NOW)[0]) == 72
+
+
+def test_lookup_misses(scheduler):
+    start, end = scheduler.standard_window(NOW)
+    scheduler.refresh(now=NOW)
+
+    assert scheduler.lookup(start, end, 0, now=NOW) is None
+    assert scheduler.lookup(start, end, 73, now=NOW) is None
+    assert scheduler.lookup(start - timedelta(days=1), end, 24, now=NOW) is None
+    assert scheduler.lookup(start, end - timedelta(hours=1), 24, now=NOW) is None
+
+
+def test_lookup_keeps_serving_previous_forecast_after_hour_boundary(scheduler):
+    scheduler.refresh(now=NOW)
+    later = NOW + timedelta(hours=1)
+    start, end = scheduler.standard_window(later)
+
+    forecast, metadata = scheduler.lookup(start, end, 24, now=later)
+    assert forecast.index[0] == end + timedelta(hours=1)
+    assert metadata.end_date == end - timedelta(hours=1)
+    # Só restam 71 horas da previsão anterior
+    assert scheduler.lookup(start, end, 72, now=later) is None
+
+
+def test_refresh_is_due_on_ingest_not_on_hour_boundary(scheduler):
+    assert scheduler.refresh_due(NOW)
+    scheduler.refresh(now=NOW)
+    assert not scheduler.refresh_due(NOW)
+    assert not scheduler.refresh_due(NOW + timedelta(hours=1))
+
+    scheduler.repository.version += 1
+    assert scheduler.refresh_due(NOW)
+
+
+def test_shared_store_round_trip_and_single_refresher(tmp_path, scheduler):
+    path = str(tmp_path / "forecast.json")
+    first, second = SharedForecastStore(path), SharedForecastStore(path)
+    assert first.acquire_refresher()
+    assert not second.acquire_refresher()
+
+    assert second.load() is None
+    scheduler.store = first
+    saved = scheduler.refresh(now=NOW)
+
+    loaded = second.load()
+    assert isinstance(loaded, PrecomputedForecast)
+    assert (loaded.start_date, loaded.end_date, loaded.data_version) == (saved.start_date, saved.end_date, 0)
+    assert list(loaded.forecast.index) == list(saved.forecast.index)
+    assert list(loaded.forecast.values) == list(saved.forecast.values)
@@ -0,0 +1,122 @@
+import csv
+import math
+import os
+import random
+import statistics
+from datetime import datetime, timedelta
+
+from src.domain.monitoring.service import StreamingPeakDetector
+from src.domain.smart_meter.entities import ConsumptionRecord
+from src.infrastructure.db.shared_memory_repository import SharedMemorySmartMeterRepository
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "smart_meter_data.csv")
+T0 = datetime(2024, 1, 1)
+
+
+def weekly_pattern(ts: datetime) -> float:
+    return 10 + 3 * math.sin(ts.hour * 2 * math.pi / 24) + (2 if ts.weekday() >= 5 else 0)
+
+
+def test_window_statistics_match_brute_force():
+    rng = random.Random(0)
+    detector = StreamingPeakDetector(window_size=24)
+    values = []
+    for i in range(500):
+        value = rng.uniform(0, 20) if i % 50 else 100.0  # picos que precisam expirar da janela
+        values.append(value)
+        detector.update("M1", T0 + timedelta(hours=i), value)
+
+        window = values[-24:]
+        peak = detector.get_peaks()[0]
+        assert math.isclose(peak.window_mean_kwh, statistics.mean(window), abs_tol=1e-9)
+        if len(window) > 1:
+            assert math.isclose(peak.window_std_kwh, statistics.stdev(window), abs_tol=1e-6)
+        assert peak.peak_kwh == max(window)
+        assert peak.peak_timestamp == T0 + timedelta(hours=i - window[::-1].index(max(window)))
+        assert (peak.last_timestamp, peak.last_consumption_kwh) == (T0 + timedelta(hours=i), value)
+
+
+def warm_up(detector: StreamingPeakDetector, weeks: int) -> int:
+    rng = random.Random(1)
+    hours = weeks * 24 * 7
+    for i in range(hours):
+        ts = T0 + timedelta(hours=i)
+        detector.update("M1", ts, weekly_pattern(ts) + rng.gauss(0, 0.1))
+    return hours
+
+
+def test_seasonal_baseline_tracks_hour_of_week_and_flags_spike():
+    detector = StreamingPeakDetector()
+    hours = warm_up(detector, 20)
+
+    # Picos em cada hora do dia seguinte: o esperado acompanha o padrão daquela hora da semana
+    for i in range(hours, hours + 24, 4):
+        ts = T0 + timedelta(hours=i)
+        event = detector.update("M1", ts, 2 * weekly_pattern(ts))
+        assert event is not None and event.z_score >= detector.z_threshold
+        assert math.isclose(event.expected_kwh, weekly_pattern(ts), rel_tol=0.05)
+        assert detector.update("M1", ts + timedelta(hours=1), weekly_pattern(ts + timedelta(hours=1))) is None
+
+    assert detector.get_anomalies(meter_id="M1", limit=1)[0].timestamp == T0 + timedelta(hours=hours + 20)
+    assert detector.get_anomalies(meter_id="M2") == []
+    assert detector.get_anomalies(limit=-5) == []
+
+
+def test_readings_below_baseline_are_not_flagged_after_sustained_overload():
+    detector = StreamingPeakDetector()
+    hours = warm_up(detector, 20)
+
+    overload = range(hours, hours + 12)
+    for i in overload:
+        ts = T0 + timedelta(hours=i)
+        detector.update("M1", ts, 1.3 * weekly_pattern(ts))
+    assert len(detector.get_anomalies(meter_id="M1")) >= 6
+
+    # Fim da sobrecarga: o z-score suavizado ainda está alto, mas as leituras voltaram ao normal ou abaixo
+    for i, factor in zip(range(hours + 12, hours + 16), (1.0, 0.98, 0.9, 0.8)):
+        ts = T0 + timedelta(hours=i)
+        assert detector.update("M1", ts, factor * weekly_pattern(ts)) is None
+
+
+def test_heat_wave_in_generated_data_is_flagged():
+    detector = StreamingPeakDetector(max_anomalies=100_000)
+    with open(DATA_PATH) as f:
+        for row in csv.DictReader(f):
+            detector.update(row["meter_id"], datetime.fromisoformat(row["timestamp"]), float(row["consumption_kwh"]))
+
+    # Pico plantado por generate_data.py: METER_001, 2024-07-15 14:00 a 2024-07-16 18:00 (29 horas)
+    start, end = datetime(2024, 7, 15, 14), datetime(2024, 7, 16, 18)
+    flagged = {
+        e.timestamp for e in detector.get_anomalies(meter_id="METER_001", limit=100_000)
+        if start <= e.timestamp <= end
+    }
+    assert len(flagged) >= 22
+
+    # Nada é sinalizado depois que a onda de calor termina (leituras voltam à linha de base)
+    after = [
+        e for e in detector.get_anomalies(meter_id="METER_001", limit=100_000)
+        if end < e.timestamp <= end + timedelta(hours=6)
+    ]
+    assert after == []
+
+
+def test_detector_follows_rows_written_by_other_workers(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text(
+        "timestamp,meter_id,consumption_kwh,temperature_c,is_weekend\n"
+        "2024-01-01 00:00:00,METER_001,10.0,20.0,False\n"
+        "2024-01-01 00:00:00,METER_002,5.0,20.0,False\n"
+    )
+    shared_path = SharedMemorySmartMeterRepository.publish_from_csv(str(csv_path), str(tmp_path / "data.bin"))
+    writer = SharedMemorySmartMeterRepository(shared_path)
+    detector = StreamingPeakDetector()
+    reader = SharedMemorySmartMeterRepository(shared_path, detector=detector)
+    assert [p.meter_id for p in detector.get_peaks()] == ["METER_001", "METER_002"]
+
+    record = ConsumptionRecord(datetime(2024, 1, 1, 1), consumption_kwh=7.0, temperature_c=22.0, is_weekend=False)
+    writer.save_consumption_record(record, "METER_003")
+    reader.refresh_detector()
+
+    peaks = {p.meter_id: p for p in detector.get_peaks()}
+    assert list(peaks) == ["METER_001", "METER_002", "METER_003"]
+    assert peaks["METER_003"].peak_kwh == 7.0
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from src.domain.smart_meter.entities import ConsumptionRecord
+from src.infrastructure.db.shared_memory_repository import SharedMemorySmartMeterRepository
+
+
+@pytest.fixture
+def shared_path(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text(
+        "timestamp,meter_id,consumption_kwh,temperature_c,is_weekend\n"
+        "2024-01-01 00:00:00,METER_001,10.0,20.0,False\n"
+        "2024-01-01 00:00:00,METER_002,5.0,20.0,False\n"
+        "2024-01-01 01:00:00,METER_001,12.0,21.0,False\n"
+        "2024-01-01 01:00:00,METER_002,6.5,21.0,False\n"
+    )
+    path = str(tmp_path / "data.bin")
+    assert SharedMemorySmartMeterRepository.publish_from_csv(str(csv_path), path, headroom=10) == path
+    return path
+
+
+def test_attach_reads_published_columns(shared_path):
+    repo = SharedMemorySmartMeterRepository(shared_path)
+
+    assert repo.version == 1
+    assert repo.get_all_meters() == ["METER_001", "METER_002"]
+    assert repo.get_total_consumption_by_hour(datetime(2024, 1, 1), datetime(2024, 1, 2)) == [
+        {'timestamp': pd.Timestamp("2024-01-01 00:00:00"), 'consumption': 15.0},
+        {'timestamp': pd.Timestamp("2024-01-01 01:00:00"), 'consumption': 18.5},
+    ]
+    records = repo.get_consumption_data(datetime(2024, 1, 1), datetime(2024, 1, 2), meter_id="METER_002")
+    assert [r.consumption_kwh for r in records] == [5.0, 6.5]
+
+
+def test_save_is_visible_to_other_attachments(shared_path):
+    writer = SharedMemorySmartMeterRepository(shared_path)
+    reader = SharedMemorySmartMeterRepository(shared_path)
+    # Lê a tabela de medidores antes da escrita, para exercitar a invalidação do cache
+    assert reader.get_all_meters() == ["METER_001", "METER_002"]
+
+    record = ConsumptionRecord(datetime(2024, 1, 1, 2), consumption_kwh=7.0, temperature_c=22.0, is_weekend=False)
+    writer.save_consumption_record(record, "METER_003")
+
+    second = SharedMemorySmartMeterRepository(shared_path)
+    for repo in (reader, second):
+        assert repo.version == 2
+        assert repo.get_all_meters() == ["METER_001", "METER_002", "METER_003"]
+        records = repo.get_consumption_data(datetime(2024, 1, 1, 2), datetime(2024, 1, 1, 2), meter_id="METER_003")
+        assert [(r.timestamp, r.consumption_kwh) for r in records] == [(pd.Timestamp("2024-01-01 02:00:00"), 7.0)]
+
+
+def test_save_fails_when_capacity_is_exhausted(shared_path):
+    repo = SharedMemorySmartMeterRepository(shared_path)
+    record = ConsumptionRecord(datetime(2024, 1, 1, 2), consumption_kwh=1.0, temperature_c=20.0, is_weekend=False)
+    for _ in range(10):
+        repo.save_consumption_record(record, "METER_001")
+
+    with pytest.raises(RuntimeError):
+        repo.save_consumption_record(record, "METER_001")
+    assert repo.version == 11
+
+
+def test_reader_never_sees_partially_written_meter_table(shared_path):
+    writer = SharedMemorySmartMeterRepository(shared_path)
+    reader = SharedMemorySmartMeterRepository(shared_path)
+    assert reader.get_all_meters() == ["METER_001", "METER_002"]
+
+    # Intercala os dois passos da escrita: bytes gravados, tamanho ainda não publicado
+    size = writer._append_meter("METER_003")
+    assert reader.get_all_meters() == ["METER_001", "METER_002"]
+    assert SharedMemorySmartMeterRepository(shared_path).get_all_meters() == ["METER_001", "METER_002"]
+
+    writer._publish_meters(size)
+    assert reader.get_all_meters() == ["METER_001", "METER_002", "METER_003"]